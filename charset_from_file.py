@@ -31,6 +31,7 @@
 #   already exists.
 # All files must be UTF-8 encoded. Notepad++ does a great job converting text to UTF-8.
 # I personally recommend using a batch file.
+# --profile, --profile-output, --profile-dump - see profiling.py.
 #
 # === Average Performance ===
 # All tests executed on plain text files encoded in UTF-8.
@@ -43,6 +44,8 @@ import os  # for handling paths
 import sys  # for printing errors.
 import time  # for measuring the elapsed time.
 
+import profiling  # for the optional --profile measurements.
+
 charset = set()  # the set of all the unique characters of the files.
 
 
@@ -70,7 +73,9 @@ parser.add_argument('-f', '--files', action='store', nargs='*', help='Paths to f
 parser.add_argument('-b', '--batch', action='store', nargs='?', help='Path to a file containing paths to the files to '
                                                                      'be processed on its every line.')
 parser.add_argument('-o', '--output', action='store', nargs=1, required=True, help='Path to the output file.')
+profiling.add_arguments(parser)
 args = parser.parse_args()
+profiler = profiling.start(args)
 
 
 def fail_with_message(message: str):
@@ -95,15 +100,20 @@ if len(paths_to_process) == 0:
     fail_with_message('Error: No paths specified in the batch file.')
 
 start_time = time.time()
-for path in paths_to_process:
-    path = path.strip()
-    if not path:
-        continue  # skip empty paths.
-    with open(path, 'r', encoding='utf_8') as file:
-        process_path(path)
-try:
-    write_result_to_file(args.output[0])
-except FileExistsError:
-    fail_with_message('Error: Output file already exists!')
+with profiler.phase('read') as phase:
+    for path in paths_to_process:
+        path = path.strip()
+        if not path:
+            continue  # skip empty paths.
+        with open(path, 'r', encoding='utf_8') as file:
+            process_path(path)
+        phase.byte_count += os.path.getsize(path)
+        phase.item_count += 1
+with profiler.phase('write', item_count=len(charset)) as phase:
+    try:
+        write_result_to_file(args.output[0])
+    except FileExistsError:
+        fail_with_message('Error: Output file already exists!')
+    phase.byte_count = os.path.getsize(args.output[0])
 end_time = time.time()
 print(f'Done in {round(end_time - start_time, 3)}s.')
@@ -16,14 +16,24 @@
 
 # A script used to calculate how many sheets of paper an essay takes.
 
+import argparse
+
+import profiling
+
 AVERAGE_CHARACTERS_PER_LINE = 36  # The average number of characters per line (not including whitespace)
 LINES_PER_PAGE = 23
 PAGES_PER_SHEET = 2
 
+parser = argparse.ArgumentParser()
+profiling.add_arguments(parser)
+args = parser.parse_args()
+
 symbols = int(input('Number of characters >> '))
-lines = round(symbols / AVERAGE_CHARACTERS_PER_LINE, 2)
-pages = round(lines / LINES_PER_PAGE, 2)
-sheets = round(pages / PAGES_PER_SHEET, 2)
+profiler = profiling.start(args)  # Started after the input so that the typing time is not measured.
+with profiler.phase('calculate', item_count=symbols):
+    lines = round(symbols / AVERAGE_CHARACTERS_PER_LINE, 2)
+    pages = round(lines / LINES_PER_PAGE, 2)
+    sheets = round(pages / PAGES_PER_SHEET, 2)
 
 print(f'Lines: {lines}')
 print(f'Pages: {pages}')
@@ -0,0 +1,207 @@
+# Copyright 2021 Alexander Laptev
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Shared timing instrumentation for the other scripts. Does nothing unless enabled.
+#
+# Enable it with the command line options (see add_arguments()):
+# --profile - write the measurements to stderr.
+# --profile-output PATH - append the measurements to a file instead.
+# --profile-dump PATH - also run cProfile and save its stats to PATH (open them with pstats or snakeviz).
+#   Only the main process is profiled. Worker pools should pass worker_initializer() so that forked workers do not
+#   keep the inherited profiler running for nothing.
+# Or with the environment variables:
+# PYTHONSTUFF_PROFILE - a switch: '1', 'true', 'yes' or 'on' write to stderr; empty, '0', 'false', 'no' or 'off' do not.
+# PYTHONSTUFF_PROFILE_OUTPUT - path to the output file, enables profiling by itself.
+# PYTHONSTUFF_PROFILE_DUMP - path to the cProfile stats.
+#
+# Every phase of a script is written as one JSON line, plus a 'total' line when a non-interactive script exits:
+# {"script": "charset_from_file", "phase": "read", "wall_s": 0.236, "cpu_s": 0.231, "children_cpu_s": 0.0,
+#  "bytes": 6952140, "items": 4, "peak_rss_bytes": 48021504, "children_peak_rss_bytes": null, "pid": 1234,
+#  "timestamp": 1634567890.123}
+# The children_* values only count finished child processes, e.g. the workers of a closed pool. The children peak RSS
+# is the largest of them, not the sum. It is null unless a child of the phase is the largest child process so far,
+# because the operating system also counts the ones from before the script started. Peak RSS is null on Windows.
+
+import atexit
+import cProfile
+import json
+import os
+import sys
+import time
+
+try:
+    import resource  # Not available on Windows.
+except ImportError:
+    resource = None
+
+PROFILE_VARIABLE = 'PYTHONSTUFF_PROFILE'
+PROFILE_OUTPUT_VARIABLE = 'PYTHONSTUFF_PROFILE_OUTPUT'
+PROFILE_DUMP_VARIABLE = 'PYTHONSTUFF_PROFILE_DUMP'
+SWITCH_ON_VALUES = ('1', 'true', 'yes', 'on')
+SWITCH_OFF_VALUES = ('', '0', 'false', 'no', 'off')
+STDERR_OUTPUT = '-'
+TOTAL_PHASE = 'total'
+
+current = None  # The profiler of the running script, set by start().
+
+
+def add_arguments(parser):
+    parser.add_argument('--profile', action='store_true', help='Write timings as JSON lines to stderr.')
+    parser.add_argument('--profile-output', action='store', metavar='PATH',
+                        help='Append timings as JSON lines to a file.')
+    parser.add_argument('--profile-dump', action='store', metavar='PATH', help='Save cProfile stats to a file.')
+
+
+def peak_rss(children: bool = False):
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports kibibytes, macOS reports bytes.
+
+
+def children_cpu_time():
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+# Measures a block of code. Set `byte_count` and `item_count` inside the block if they are not known beforehand.
+class Phase:
+    def __init__(self, profiler, name: str, byte_count: int = 0, item_count: int = 0):
+        self.profiler = profiler
+        self.name = name
+        self.byte_count = byte_count
+        self.item_count = item_count
+        self.wall_start = 0.0
+        self.cpu_start = 0.0
+        self.children_cpu_start = 0.0
+        self.children_peak_rss_start = None
+
+    def __enter__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.children_cpu_start = children_cpu_time()
+        self.children_peak_rss_start = peak_rss(children=True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        children_peak = peak_rss(children=True)
+        if children_peak == self.children_peak_rss_start:
+            children_peak = None  # No child of this phase beat the ones from before, e.g. the shell of the script.
+        self.profiler.record(
+            self.name,
+            time.perf_counter() - self.wall_start,
+            time.process_time() - self.cpu_start,
+            children_cpu_time() - self.children_cpu_start,
+            children_peak,
+            self.byte_count,
+            self.item_count
+        )
+        return False
+
+
+class Profiler:
+    def __init__(self, script: str, output: str = None, dump_path: str = None):
+        self.script = script
+        self.output = output  # None if disabled, STDERR_OUTPUT or a path.
+        self.dump_path = dump_path
+        self.profile = None
+        self.total = None
+
+    def phase(self, name: str, byte_count: int = 0, item_count: int = 0):
+        return Phase(self, name, byte_count, item_count)
+
+    def record(self, phase: str, wall: float, cpu: float, children_cpu: float, children_peak_rss: int,
+               byte_count: int, item_count: int):
+        if self.output is None:
+            return
+        line = json.dumps({
+            'script': self.script,
+            'phase': phase,
+            'wall_s': wall,
+            'cpu_s': cpu,
+            'children_cpu_s': children_cpu,
+            'bytes': byte_count,
+            'items': item_count,
+            'peak_rss_bytes': peak_rss(),
+            'children_peak_rss_bytes': children_peak_rss,
+            'pid': os.getpid(),
+            'timestamp': time.time(),
+        })
+        if self.output == STDERR_OUTPUT:
+            print(line, file=sys.stderr)
+        else:
+            with open(self.output, 'a', encoding='utf_8') as file:
+                file.write(line + '\n')
+
+    def start(self, measure_total: bool = True):
+        if self.dump_path is not None:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        if measure_total:
+            self.total = self.phase(TOTAL_PHASE).__enter__()
+
+    def finish(self):
+        if self.total is not None:
+            self.total.__exit__(None, None, None)
+            self.total = None
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.dump_path)
+            self.profile = None
+
+
+# Creates the profiler of the running script from its parsed arguments (if any) and the environment, and starts it.
+# The 'total' phase is recorded when the script exits, even with exit(). Interactive scripts may skip it, because it
+# would mostly measure how long the user took to type.
+def start(args=None, measure_total: bool = True):
+    script = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    output, dump_path = resolve_output(args)
+
+    global current
+    profiler = Profiler(script, output, dump_path)
+    profiler.start(measure_total)
+    atexit.register(profiler.finish)
+    current = profiler
+    return profiler
+
+
+# Returns where the measurements and the cProfile stats go, from the arguments (if any) and the environment.
+# The arguments win. None means disabled.
+def resolve_output(args=None):
+    switch = os.environ.get(PROFILE_VARIABLE, '').strip().lower()
+    if switch not in SWITCH_ON_VALUES + SWITCH_OFF_VALUES:
+        print(f'Warning: Ignoring {PROFILE_VARIABLE}={switch!r}, expected one of '
+              f'{SWITCH_ON_VALUES + SWITCH_OFF_VALUES}. Use {PROFILE_OUTPUT_VARIABLE} for a path.', file=sys.stderr)
+    output = STDERR_OUTPUT if switch in SWITCH_ON_VALUES else None
+    output = os.environ.get(PROFILE_OUTPUT_VARIABLE) or output
+    dump_path = os.environ.get(PROFILE_DUMP_VARIABLE) or None
+    if args is not None:
+        if args.profile:
+            output = STDERR_OUTPUT
+        if args.profile_output is not None:
+            output = args.profile_output
+        if args.profile_dump is not None:
+            dump_path = args.profile_dump
+    return output, dump_path
+
+
+# Pass as the `initializer` of a multiprocessing pool. A forked worker inherits the running cProfile hook but its stats
+# would never be saved, so it is turned off there.
+def worker_initializer():
+    if current is not None and current.profile is not None:
+        current.profile.disable()
+        current.profile = None
+        current.total = None  # The 'total' phase belongs to the parent.
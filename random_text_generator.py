@@ -15,8 +15,11 @@
 # SOFTWARE.
 
 import argparse
+import os
 import random
 
+import profiling
+
 latin_lower = 'qwertyuiopasdfghjklzxcvbnm'
 latin_upper = latin_lower.upper()
 cyrillic_lower = 'йцукенгшщзхъфывапролджэячсмитьбю'
@@ -28,11 +31,15 @@ chars = latin_lower + latin_upper + cyrillic_upper + cyrillic_lower + numbers +
 parser = argparse.ArgumentParser()
 parser.add_argument('-o', '--output', action='store', nargs=1, required=True, help='The output file. Will be created.')
 parser.add_argument('-l', '--length', action='store', nargs=1, required=True, help='The length of the produced file.')
+profiling.add_arguments(parser)
 args = parser.parse_args()
+profiler = profiling.start(args)
 output_file_path = args.output[0]
 length = int(args.length[0])
 
-with open(output_file_path, 'x', encoding='utf_8') as file:
-    for _ in range(length):
-        file.write(random.choice(chars))
+with profiler.phase('generate', item_count=length) as phase:
+    with open(output_file_path, 'x', encoding='utf_8') as file:
+        for _ in range(length):
+            file.write(random.choice(chars))
+    phase.byte_count = os.path.getsize(output_file_path)
 print('Done.')
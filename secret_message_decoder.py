@@ -18,10 +18,33 @@
 # ASCII (e.g. English) ciphers, I guess.
 #
 # Supports: Atbash cipher, Caesar cipher, Binary, Hexadecimal, Morse code.
+#
+# Run without arguments for the interactive mode. Huge binary, hexadecimal and morse files may be decoded as a stream:
+# -i (--input) - path to the file to be decoded.
+# -o (--output) - path to the output file. Will be created, must not exist.
+# -m (--mode) - binary | hexadecimal | morse. Line breaks in morse files are kept.
+#
+# A JSON lines file of messages with unknown ciphers may be decoded with -b (--batch) and the same -i and -o options.
+# Each line needs a "message" field. Every mode is tried and the most English-looking result is written with its mode:
+# {"input": <the record>, "mode": "atbash", "decoded": "...", "score": -2.5, "error": null}
+# Broken lines are written with an "error" instead and do not stop the batch.
+# -j (--jobs) - number of worker processes. Defaults to the number of CPUs.
+#
+# --profile, --profile-output, --profile-dump - see profiling.py.
 
+import argparse
 import binascii
+import codecs
+import json
+import math
+import multiprocessing
+import os
+import sys
+from collections import Counter, deque
 from enum import Enum, auto
 
+import profiling
+
 SEPARATOR = '=' * 24
 
 NEW_MESSAGE_COMMAND = 'new'
@@ -66,10 +89,53 @@ MORSE = {  # Copied from StackOverflow and pretty-printed with another small Pyt
 EXIT_COMMANDS = ('exit', 'quit', 'e', 'q')
 EXIT_COMMANDS_JOINED = ' | '.join(EXIT_COMMANDS)
 
+MORSE_MAX_LENGTH = max(len(word) for word in MORSE)
+BINARY_DIGITS = {'0', '1'}
+STREAM_CHUNK_SIZE = 1024 * 1024  # In characters.
+
 ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
 ALPHABET_LENGTH = len(ALPHABET)
 SAMPLE_MAX_LENGTH = 14
 
+# Relative frequencies of letters in English text, in percent. Used to guess the Caesar shift.
+ENGLISH_LETTER_FREQUENCIES = (
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153, 0.772, 4.025, 2.406,
+    6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 0.978, 2.360, 0.150, 1.974, 0.074
+)
+ENGLISH_LETTER_LOG_PROBABILITIES = tuple(math.log(f / 100) for f in ENGLISH_LETTER_FREQUENCIES)
+# The average log-likelihood per letter of English text and of uniformly random letters.
+ENGLISH_LETTERS_LOG_LIKELIHOOD = sum(f / 100 * p for f, p in zip(ENGLISH_LETTER_FREQUENCIES,
+                                                                ENGLISH_LETTER_LOG_PROBABILITIES))
+RANDOM_LETTERS_LOG_LIKELIHOOD = sum(ENGLISH_LETTER_LOG_PROBABILITIES) / ALPHABET_LENGTH
+# Rough shares of letters, spaces and other printable characters in English text. Used to rank the batch decodes.
+ENGLISH_LETTER_SHARE_LOG = math.log(0.8)
+ENGLISH_SPACE_LOG_PROBABILITY = math.log(0.17)
+ENGLISH_OTHER_LOG_PROBABILITY = math.log(0.03 / 33)  # Spread over the other printable ASCII characters.
+ENGLISH_FOREIGN_LETTER_LOG_PROBABILITY = math.log(0.8 / 33)  # Letters of other alphabets, e.g. Cyrillic.
+ENGLISH_UNPRINTABLE_LOG_PROBABILITY = math.log(1e-6)
+# The 50 most common letter pairs in English words, in percent. The other 626 pairs share what is left.
+ENGLISH_BIGRAM_FREQUENCIES = {
+    'th': 3.56, 'he': 3.07, 'in': 2.43, 'er': 2.05, 'an': 1.99, 're': 1.85, 'on': 1.76, 'at': 1.49, 'en': 1.45,
+    'nd': 1.35, 'ti': 1.34, 'es': 1.34, 'or': 1.28, 'te': 1.20, 'of': 1.17, 'ed': 1.17, 'is': 1.13, 'it': 1.12,
+    'al': 1.09, 'ar': 1.07, 'st': 1.05, 'to': 1.04, 'nt': 1.04, 'ng': 0.95, 'se': 0.93, 'ha': 0.93, 'as': 0.87,
+    'ou': 0.87, 'io': 0.83, 'le': 0.83, 've': 0.83, 'co': 0.79, 'me': 0.79, 'de': 0.76, 'hi': 0.76, 'ri': 0.73,
+    'ro': 0.73, 'ic': 0.70, 'ne': 0.69, 'ea': 0.69, 'ra': 0.69, 'ce': 0.65, 'li': 0.62, 'ch': 0.60, 'll': 0.58,
+    'be': 0.58, 'ma': 0.57, 'si': 0.55, 'om': 0.55, 'ur': 0.54
+}
+# Log-probabilities of the pairs relative to uniformly random pairs: positive for common pairs, negative for the rest.
+ENGLISH_RARE_BIGRAM_LOG_RATIO = math.log((100 - sum(ENGLISH_BIGRAM_FREQUENCIES.values())) / 100
+                                         / (ALPHABET_LENGTH ** 2 - len(ENGLISH_BIGRAM_FREQUENCIES))
+                                         * ALPHABET_LENGTH ** 2)
+ENGLISH_BIGRAM_LOG_RATIOS = {pair: math.log(f / 100 * ALPHABET_LENGTH ** 2)
+                             for pair, f in ENGLISH_BIGRAM_FREQUENCIES.items()}
+# Caesar picks the best of 26 shifts by the same kind of score it is ranked by, so it pays for that choice once per
+# message. Otherwise it would beat the real decode of short Atbash messages with a well-fitted shift of gibberish.
+CAESAR_CHOICE_PENALTY = math.log(ALPHABET_LENGTH)
+CAESAR_CANDIDATES = 3  # Best shifts by letter frequency which are compared by english_score() in the batch mode.
+
+BATCH_CHUNK_SIZE = 256  # Records per task sent to a worker process.
+BATCH_TASKS_PER_WORKER = 4  # How many tasks per worker may be in flight. Bounds the memory used by the batch mode.
+
 
 class Mode(Enum):
     ATBASH = auto()
@@ -79,12 +145,6 @@ class Mode(Enum):
     MORSE = auto()
 
 
-# Splits `iterable` in chunks of `size` elements. Used by the binary and hexadecimal decoders.
-def chunks(iterable, size):
-    for i in range(0, len(iterable), size):
-        yield iterable[i:i + size]
-
-
 def decrypt_atbash(string: str):
     result = []
     for char in string:
@@ -134,30 +194,148 @@ def sample_caesar(string: str):
         print(message)
 
 
-def decrypt_caesar(string: str):
+# Scores every Caesar shift of `string` by the average log-likelihood per letter of the shifted letters in English.
+# Returns (score, shift) pairs, the best first, and the number of letters.
+#
+# The message is read only once to build the letter histogram. The rotated histogram is then scored against the English
+# letter frequencies, so the rest of the work is 26x26 no matter the length.
+def rank_caesar_shifts(string: str):
+    counts = Counter(string.casefold())
+    histogram = [counts[c] for c in ALPHABET]
+    letter_count = sum(histogram)
+    if letter_count == 0:
+        return [(0.0, shift) for shift in range(ALPHABET_LENGTH)], 0
+
+    scores = []
+    for shift in range(ALPHABET_LENGTH):
+        score = 0.0
+        for index, count in enumerate(histogram):
+            score += count * ENGLISH_LETTER_LOG_PROBABILITIES[(index + shift) % ALPHABET_LENGTH]
+        scores.append((score / letter_count, shift))
+    scores.sort(key=lambda pair: pair[0], reverse=True)
+    return scores, letter_count
+
+
+# Guesses the Caesar shift of `string`. Returns the shift which decrypts it, how well the result fits English and how
+# far the best shift is ahead of the second best.
+#
+# The fit is 0 for uniformly random letters and 1 for letters with exactly the English frequencies (short messages may
+# go past that, so it is clamped). The margin is in nats per letter; a small one means the guess is a coin toss.
+# Both are per letter, so unlike the raw likelihoods they do not grow with the length of the message.
+def detect_caesar_shift(string: str):
+    scores, letter_count = rank_caesar_shifts(string)
+    if letter_count == 0:
+        return 0, 0.0, 0.0
+    (best_score, best_shift), (second_score, _) = scores[0], scores[1]
+    english_range = ENGLISH_LETTERS_LOG_LIKELIHOOD - RANDOM_LETTERS_LOG_LIKELIHOOD
+    fit = (best_score - RANDOM_LETTERS_LOG_LIKELIHOOD) / english_range
+    return best_shift, min(max(fit, 0.0), 1.0), best_score - second_score
+
+
+# Shows the samples and the best guess, and asks the user for the shift.
+def ask_caesar_shift(string: str):
+    best_shift, fit, margin = detect_caesar_shift(string)
     sample_caesar(string)
-    valid_shift = int(input('Valid shift >> '))
+    print(f'Best guess: +{best_shift}/-{ALPHABET_LENGTH - best_shift} (looks {round(fit * 100)}% like English, '
+          f'{round(margin, 2)} ahead of the next shift).')
+    cin = input('Valid shift (empty for the best guess) >> ')
+    valid_shift = int(cin) if cin and not cin.isspace() else best_shift
     print(SEPARATOR)
-    return shift_letters(string, valid_shift)
+    return valid_shift
+
+
+# Asks for the shift unless it is given or `automatic` is set, then the best guess is used.
+def decrypt_caesar(string: str, automatic: bool = False, shift: int = None):
+    if shift is None:
+        shift = detect_caesar_shift(string)[0] if automatic else ask_caesar_shift(string)
+    return shift_letters(string, shift)
+
+
+# The streaming decoders below take the message chunk by chunk with feed() and return whatever could be decoded so far.
+# Partial bytes, nibbles and morse words are kept until the next chunk arrives. Call finish() once the input is over.
+class BinaryDecoder:
+    def __init__(self):
+        self.bits = ''  # Bits left over from the previous chunk, always fewer than 8.
+
+    def feed(self, chunk: str):
+        chunk = ''.join(chunk.split())
+        if not set(chunk) <= BINARY_DIGITS:
+            raise ValueError('Chunk is not valid binary.')
+        bits = self.bits + chunk
+        usable_length = len(bits) - len(bits) % 8
+        self.bits = bits[usable_length:]
+        return bits_to_text(bits[:usable_length])
+
+    def finish(self):
+        bits = self.bits  # A trailing incomplete octet is decoded as is, e.g. '1000001' is 'A'.
+        self.bits = ''
+        return bits_to_text(bits)
+
+
+class HexadecimalDecoder:
+    def __init__(self):
+        self.nibble = ''  # A hex digit left over from the previous chunk, if any.
+        self.decoder = codecs.getincrementaldecoder('utf_8')()  # Keeps incomplete UTF-8 sequences too.
+
+    def feed(self, chunk: str):
+        digits = self.nibble + ''.join(chunk.split())
+        usable_length = len(digits) - len(digits) % 2
+        self.nibble = digits[usable_length:]
+        return self.decoder.decode(binascii.unhexlify(digits[:usable_length]))
+
+    def finish(self):
+        if self.nibble:
+            raise binascii.Error('Odd-length string')
+        return self.decoder.decode(b'', final=True)
+
+
+class MorseDecoder:  # Words are separated by single spaces. Line breaks are kept, CRs are dropped.
+    def __init__(self):
+        self.word = ''  # The last word of the previous chunk, which may continue in the next one.
+        self.after_line_break = False  # Whether `word` starts a new line, so it may be empty.
+
+    def feed(self, chunk: str):
+        lines = (self.word + chunk.replace('\r', '')).split('\n')
+        result = []
+        for line in lines[:-1]:
+            if line:
+                result += decode_morse_words(line.split(' '))
+            result += '\n'
+        if len(lines) > 1:
+            self.after_line_break = True
+        last_line = lines[-1].split(' ')
+        self.word = last_line.pop()
+        if last_line:
+            self.after_line_break = False
+            result += decode_morse_words(last_line)
+        if len(self.word) > MORSE_MAX_LENGTH:  # Fail early instead of buffering garbage.
+            raise ValueError('Word is not a valid morse word.')
+        return ''.join(result)
 
+    def finish(self):
+        word = self.word
+        self.word = ''
+        if not word and self.after_line_break:  # The file ends with a line break.
+            return ''
+        return decode_morse_words((word,))
 
-def decrypt_binary(string: str):
-    string = ''.join(string.split())
-    result = []
-    for char in chunks(string, 8):
-        ascii = chr(int(char, 2))
-        result += ascii
-    return ''.join(result)
 
+STREAM_DECODERS = {
+    Mode.BINARY: BinaryDecoder,
+    Mode.HEXADECIMAL: HexadecimalDecoder,
+    Mode.MORSE: MorseDecoder,
+}
 
-def decrypt_hexadecimal(string: str):
-    string = ''.join(string.split())
-    return binascii.unhexlify(string).decode()
 
+def bits_to_text(bits: str):
+    if not bits:
+        return ''
+    length = (len(bits) + 7) // 8
+    return int(bits, 2).to_bytes(length, 'big').decode('latin_1')  # Bytes 0-255 map to the same code points.
 
-def decrypt_morse(string: str):
+
+def decode_morse_words(words):
     result = []
-    words = string.split(' ')
     for word in words:
         decrypted = MORSE.get(word, '')
         if not decrypted:
@@ -166,6 +344,56 @@ def decrypt_morse(string: str):
     return ''.join(result)
 
 
+# Yields the decoded text of every chunk as soon as it is available.
+def decode_stream(decoder, chunks):
+    for chunk in chunks:
+        decoded = decoder.feed(chunk)
+        if decoded:
+            yield decoded
+    decoded = decoder.finish()
+    if decoded:
+        yield decoded
+
+
+# Reads the file in chunks of `size` characters.
+def read_chunks(file, size: int = STREAM_CHUNK_SIZE):
+    chunk = file.read(size)
+    while chunk:
+        yield chunk
+        chunk = file.read(size)
+
+
+# Decodes a whole file using constant memory. The output file is created, it must not exist. It is removed again if
+# the input turns out to be invalid.
+# Returns the number of decoded characters.
+def decode_file(input_path: str, output_path: str, mode: Mode):
+    decoder = STREAM_DECODERS[mode]()
+    length = 0
+    with open(input_path, 'r', encoding='utf_8') as input_file, \
+            open(output_path, 'x', encoding='utf_8') as output_file:
+        try:
+            for decoded in decode_stream(decoder, read_chunks(input_file)):
+                output_file.write(decoded)
+                length += len(decoded)
+        except BaseException:  # Don't leave a half-written file behind, it would block the next attempt.
+            output_file.close()
+            os.remove(output_path)
+            raise
+    return length
+
+
+def decrypt_binary(string: str):
+    return ''.join(decode_stream(BinaryDecoder(), (string,)))
+
+
+def decrypt_hexadecimal(string: str):
+    return ''.join(decode_stream(HexadecimalDecoder(), (string,)))
+
+
+def decrypt_morse(string: str):
+    return ''.join(decode_stream(MorseDecoder(), (string,)))
+
+
 def get_command():
     # Print all modes
     for mode in Mode:
@@ -189,12 +417,12 @@ def welcome():
     print(SEPARATOR)
 
 
-def decrypt(string: str, mode: Mode):
+def decrypt(string: str, mode: Mode, caesar_shift: int = None):
     decrypted = None
     if mode == Mode.ATBASH:  # Had to replace match/case to make it work with Python older than 3.10.
         decrypted = decrypt_atbash(string)
     elif mode == Mode.CAESAR:
-        decrypted = decrypt_caesar(string)
+        decrypted = decrypt_caesar(string, shift=caesar_shift)
     elif mode == Mode.BINARY:
         try:
             decrypted = decrypt_binary(string)
@@ -204,7 +432,7 @@ def decrypt(string: str, mode: Mode):
     elif mode == Mode.HEXADECIMAL:
         try:
             decrypted = decrypt_hexadecimal(string)
-        except binascii.Error:
+        except (binascii.Error, UnicodeDecodeError):
             print('!!! Invalid hex !!!')
             return None
     elif mode == Mode.MORSE:
@@ -217,28 +445,211 @@ def decrypt(string: str, mode: Mode):
     return decrypted
 
 
-# The main loop.
-welcome()
-message = get_message()
+# How good English `string` looks, as the average log-probability of its characters plus a bonus (or a penalty) for
+# common (or rare) pairs of adjacent letters. The higher, the better.
+def english_score(string: str):
+    if not string:
+        return -math.inf
+    string = string.casefold()
+    score = 0.0
+    for char, count in Counter(string).items():
+        index = ALPHABET.find(char)
+        if index != -1:
+            log_probability = ENGLISH_LETTER_SHARE_LOG + ENGLISH_LETTER_LOG_PROBABILITIES[index]
+        elif char.isspace():
+            log_probability = ENGLISH_SPACE_LOG_PROBABILITY
+        elif char.isalpha():
+            log_probability = ENGLISH_FOREIGN_LETTER_LOG_PROBABILITY
+        elif char.isprintable():
+            log_probability = ENGLISH_OTHER_LOG_PROBABILITY
+        else:
+            log_probability = ENGLISH_UNPRINTABLE_LOG_PROBABILITY
+        score += count * log_probability
+    for first, second in zip(string, string[1:]):
+        if first in ALPHABET and second in ALPHABET:
+            score += ENGLISH_BIGRAM_LOG_RATIOS.get(first + second, ENGLISH_RARE_BIGRAM_LOG_RATIO)
+    return score / len(string)
+
+
+# The batch mode version of decrypt_caesar(). The few best shifts by letter frequency are compared as whole texts.
+def decrypt_caesar_best(string: str):
+    scores, _ = rank_caesar_shifts(string)
+    candidates = (shift_letters(string, shift) for _, shift in scores[:CAESAR_CANDIDATES])
+    return max(candidates, key=english_score)
+
+
+# Decoders which need no input from the user. Invalid binary, hex and morse fail on the first bad chunk or word.
+AUTOMATIC_DECRYPTORS = {
+    Mode.ATBASH: decrypt_atbash,
+    Mode.CAESAR: decrypt_caesar_best,
+    Mode.BINARY: decrypt_binary,
+    Mode.HEXADECIMAL: decrypt_hexadecimal,
+    Mode.MORSE: decrypt_morse,
+}
 
-while True:
-    print(SEPARATOR)
-    cmd = get_command()
-    print(SEPARATOR)
 
-    if cmd in EXIT_COMMANDS:
-        break
-    elif cmd == NEW_MESSAGE_COMMAND:
-        message = get_message()
-    else:
+# Tries every mode on `string`. Returns the mode, the decoded message and its score, or None if nothing fits.
+def decrypt_best(string: str):
+    best = None
+    for mode, decryptor in AUTOMATIC_DECRYPTORS.items():
         try:
-            mode = Mode(int(cmd))
-        except ValueError:
-            print('Invalid mode.')
+            decrypted = decryptor(string)
+        except ValueError:  # binascii.Error and UnicodeDecodeError are ValueErrors too.
             continue
-
-        decrypted = decrypt(message, mode)
-        if decrypted is None:
-            print("!!! Couldn't decrypt the message !!!")
+        score = english_score(decrypted)
+        if mode == Mode.CAESAR and decrypted:
+            score -= CAESAR_CHOICE_PENALTY / len(decrypted)
+        if best is None or score > best[2]:
+            best = (mode, decrypted, score)
+    return best
+
+
+# Decodes a single JSON line with a 'message' field. The output line keeps the record as is under 'input' and adds
+# 'mode', 'decoded', 'score' and 'error' next to it, so no field of the record is overwritten.
+# A broken record does not stop the batch: it gets an 'error' instead, so the output keeps its place.
+def decrypt_record(line: str):
+    result = {'input': None, 'mode': None, 'decoded': None, 'score': None, 'error': None}
+    try:
+        result['input'] = json.loads(line)
+        message = result['input']['message']
+        if not isinstance(message, str):
+            raise TypeError('"message" is not a string')
+        best = decrypt_best(message)
+    except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as error:
+        result['error'] = f'{type(error).__name__}: {error}'
+        return json.dumps(result, ensure_ascii=False)
+
+    if best is not None:
+        mode, decrypted, score = best
+        result.update(mode=mode.name.lower(), decoded=decrypted, score=round(score, 4))
+    return json.dumps(result, ensure_ascii=False)
+
+
+def decrypt_records(lines):
+    return [decrypt_record(line) for line in lines]
+
+
+# Groups non-empty lines of the file in lists of `size` lines.
+def read_batches(file, size: int = BATCH_CHUNK_SIZE):
+    batch = []
+    for line in file:
+        if line.isspace():
+            continue
+        batch.append(line)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Decodes a JSON lines file using a process pool. The output keeps the order of the input and must not exist.
+# Returns the number of records.
+def decrypt_batch(input_path: str, output_path: str, jobs: int):
+    max_pending = jobs * BATCH_TASKS_PER_WORKER
+    count = 0
+    with open(input_path, 'r', encoding='utf_8') as input_file, \
+            open(output_path, 'x', encoding='utf_8') as output_file, \
+            multiprocessing.Pool(jobs, initializer=profiling.worker_initializer) as pool:
+        pending = deque()
+        for batch in read_batches(input_file):
+            count += len(batch)
+            pending.append(pool.apply_async(decrypt_records, (batch,)))
+            if len(pending) >= max_pending:
+                output_file.writelines(line + '\n' for line in pending.popleft().get())
+        while pending:
+            output_file.writelines(line + '\n' for line in pending.popleft().get())
+    return count
+
+
+# The main loop. Every decryption is a phase of `profiler`, without the time spent typing.
+def run_interactive(profiler):
+    welcome()
+    message = get_message()
+
+    while True:
+        print(SEPARATOR)
+        cmd = get_command()
+        print(SEPARATOR)
+
+        if cmd in EXIT_COMMANDS:
+            break
+        elif cmd == NEW_MESSAGE_COMMAND:
+            message = get_message()
         else:
-            print(f'RESULT: {decrypted}')
+            try:
+                mode = Mode(int(cmd))
+            except ValueError:
+                print('Invalid mode.')
+                continue
+
+            caesar_shift = ask_caesar_shift(message) if mode == Mode.CAESAR else None
+            with profiler.phase(f'decrypt_{mode.name.lower()}', len(message.encode()), len(message)):
+                decrypted = decrypt(message, mode, caesar_shift)
+            if decrypted is None:
+                print("!!! Couldn't decrypt the message !!!")
+            else:
+                print(f'RESULT: {decrypted}')
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Decodes secret messages. Runs interactively without arguments.')
+    parser.add_argument('-i', '--input', action='store', help='Path to a file to be decoded as a stream.')
+    parser.add_argument('-o', '--output', action='store', help='Path to the output file. Will be created.')
+    parser.add_argument('-m', '--mode', action='store', choices=[mode.name.lower() for mode in STREAM_DECODERS],
+                        help='How the input file is encoded.')
+    parser.add_argument('-b', '--batch', action='store_true', help='The input file is JSON lines with a "message" '
+                                                                   'field. Every mode is tried on every message.')
+    parser.add_argument('-j', '--jobs', action='store', type=int, default=os.cpu_count(),
+                        help='Number of worker processes for the batch mode.')
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+
+    def fail_with_message(message: str):
+        parser.print_usage(file=sys.stderr)
+        print(message, file=sys.stderr)
+        exit(-1)
+
+    if args.batch and (args.input is None or args.output is None):
+        fail_with_message('Error: The batch mode needs the input file and the output file.')
+    elif args.batch and args.mode is not None:
+        fail_with_message('Error: The batch mode picks the mode itself.')
+    elif args.input is not None and not args.batch and (args.output is None or args.mode is None):
+        fail_with_message('Error: Streaming needs the input file, the output file and the mode.')
+    if args.jobs < 1:
+        fail_with_message('Error: Need at least one job.')
+    return args
+
+
+def main():
+    args = parse_arguments()
+    if args.input is None:
+        # The whole session would mostly measure the typing, so only the decryptions are recorded.
+        run_interactive(profiling.start(args, measure_total=False))
+        return
+
+    profiler = profiling.start(args)
+
+    if args.batch:
+        try:
+            with profiler.phase('batch', byte_count=os.path.getsize(args.input)) as phase:
+                phase.item_count = decrypt_batch(args.input, args.output, args.jobs)
+        except FileExistsError:
+            print('Error: Output file already exists!', file=sys.stderr)
+            exit(-1)
+        return
+
+    mode = Mode[args.mode.upper()]
+    try:
+        with profiler.phase(f'stream_{mode.name.lower()}', byte_count=os.path.getsize(args.input)) as phase:
+            phase.item_count = decode_file(args.input, args.output, mode)
+    except FileExistsError:
+        print('Error: Output file already exists!', file=sys.stderr)
+        exit(-1)
+    except (binascii.Error, ValueError):  # UnicodeDecodeError is a ValueError as well.
+        print(f'!!! Invalid {mode.name.lower()} !!!', file=sys.stderr)
+        exit(-1)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,14 +14,22 @@
 # TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import argparse  # for the --profile options
 import math  # for sqrt
 
+import profiling
+
+parser = argparse.ArgumentParser()
+profiling.add_arguments(parser)
+args = parser.parse_args()
+
 data = [float(x) for x in input('Enter your data >> ').split()]  # values separated by whitespace
+profiler = profiling.start(args)  # started after the input so that the typing time is not measured
 
-mean = sum(data) / len(data)
+with profiler.phase('calculate', item_count=len(data)):
+    mean = sum(data) / len(data)
+    data = [x - mean for x in data]
+    squares = [x * x for x in data]
+    squares_mean = sum(squares) / len(squares)
 print(f'Mean: {mean}')
-
-data = [x - mean for x in data]
-squares = [x * x for x in data]
-squares_mean = sum(squares) / len(squares)
 print(f'Sigma = {math.sqrt(squares_mean)}')
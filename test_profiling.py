@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import profiling
+
+RECORD_KEYS = {
+    'script', 'phase', 'wall_s', 'cpu_s', 'children_cpu_s', 'bytes', 'items', 'peak_rss_bytes',
+    'children_peak_rss_bytes', 'pid', 'timestamp'
+}
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def parse(*argv):
+    parser = argparse.ArgumentParser()
+    profiling.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def test_phase_record(tmp_path):
+    output = tmp_path / 'profile.jsonl'
+    profiler = profiling.Profiler('test', str(output))
+    with profiler.phase('work', byte_count=10) as phase:
+        sum(range(1000))
+        phase.item_count = 3
+
+    record, = read_records(output)
+    assert set(record) == RECORD_KEYS
+    assert (record['script'], record['phase'], record['bytes'], record['items']) == ('test', 'work', 10, 3)
+    assert record['wall_s'] >= 0 and record['cpu_s'] >= 0
+    assert record['children_peak_rss_bytes'] is None  # No child process was started.
+
+
+def test_disabled_profiler_writes_nothing(tmp_path):
+    profiler = profiling.Profiler('test')
+    with profiler.phase('work'):
+        pass
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize('switch, expected', [
+    ('', None), ('0', None), ('false', None), ('off', None),
+    ('1', profiling.STDERR_OUTPUT), ('true', profiling.STDERR_OUTPUT), ('YES', profiling.STDERR_OUTPUT),
+    ('foo', None),
+])
+def test_environment_switch(monkeypatch, tmp_path, switch, expected):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(profiling.PROFILE_VARIABLE, switch)
+    monkeypatch.delenv(profiling.PROFILE_OUTPUT_VARIABLE, raising=False)
+    monkeypatch.delenv(profiling.PROFILE_DUMP_VARIABLE, raising=False)
+    assert profiling.resolve_output() == (expected, None)
+    assert not list(tmp_path.iterdir())  # The value is never used as a path.
+
+
+def test_environment_output_and_arguments(monkeypatch):
+    monkeypatch.delenv(profiling.PROFILE_VARIABLE, raising=False)
+    monkeypatch.setenv(profiling.PROFILE_OUTPUT_VARIABLE, 'env.jsonl')
+    monkeypatch.setenv(profiling.PROFILE_DUMP_VARIABLE, 'env.prof')
+    assert profiling.resolve_output() == ('env.jsonl', 'env.prof')
+    assert profiling.resolve_output(parse('--profile')) == (profiling.STDERR_OUTPUT, 'env.prof')
+    assert profiling.resolve_output(parse('--profile-output', 'a.jsonl', '--profile-dump', 'a.prof')) == \
+        ('a.jsonl', 'a.prof')
+
+
+def test_total_written_at_exit(tmp_path):
+    output = tmp_path / 'profile.jsonl'
+    environment = dict(os.environ, **{profiling.PROFILE_OUTPUT_VARIABLE: str(output)})
+    environment.pop(profiling.PROFILE_VARIABLE, None)
+    code = 'import profiling\nprofiler = profiling.start()\nwith profiler.phase("work"):\n    pass\nexit(3)\n'
+    process = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(profiling.__file__), env=environment)
+    assert process.returncode == 3
+    assert [record['phase'] for record in read_records(output)] == ['work', profiling.TOTAL_PHASE]
@@ -0,0 +1,176 @@
+import binascii
+import json
+import random
+
+import pytest
+
+import secret_message_decoder as decoder
+
+
+SENTENCE = 'The quick brown fox jumps over the lazy dog while the farmer watches from the porch'
+
+
+@pytest.mark.parametrize('shift', [3, 13, 25])
+def test_caesar_shift_recovered(shift):
+    encrypted = decoder.shift_letters(SENTENCE, shift)
+    best_shift, fit, margin = decoder.detect_caesar_shift(encrypted)
+    assert decoder.shift_letters(encrypted, best_shift) == SENTENCE
+    assert fit > 0.5
+    assert margin > 0.1
+
+
+def test_caesar_without_letters():
+    assert decoder.detect_caesar_shift('123 !?') == (0, 0.0, 0.0)
+    assert decoder.decrypt_caesar('123 !?', automatic=True) == '123 !?'
+
+
+def test_caesar_automatic_round_trip():
+    assert decoder.decrypt_caesar(decoder.shift_letters(SENTENCE, 7), automatic=True) == SENTENCE
+
+
+def test_caesar_fit_does_not_grow_with_length():
+    rng = random.Random(1)
+    noise = ''.join(rng.choice(decoder.ALPHABET) for _ in range(10000))
+    _, fit, margin = decoder.detect_caesar_shift(noise)
+    assert fit < 0.5
+    assert margin < 0.1
+
+
+def decode_chunks(decoder_class, chunks):
+    return ''.join(decoder.decode_stream(decoder_class(), chunks))
+
+
+def split_everywhere(string):
+    return [[string[:offset], string[offset:]] for offset in range(len(string) + 1)]
+
+
+BINARY_HI = '01001000 01101001\n00100001'
+HEX_UTF8 = '48 c3a9 e282ac'  # 'H', a two byte and a three byte UTF-8 sequence.
+
+
+@pytest.mark.parametrize('chunks', split_everywhere(BINARY_HI))
+def test_binary_split_anywhere(chunks):
+    assert decode_chunks(decoder.BinaryDecoder, chunks) == 'Hi!'
+
+
+def test_binary_single_characters():
+    assert decode_chunks(decoder.BinaryDecoder, BINARY_HI) == 'Hi!'
+
+
+def test_binary_incomplete_octet():
+    assert decode_chunks(decoder.BinaryDecoder, ['0100', '0001 100', '0001']) == 'AA'
+
+
+@pytest.mark.parametrize('string', ['0102', '+101', '1_01', '01 2'])
+def test_binary_invalid(string):
+    with pytest.raises(ValueError):
+        decode_chunks(decoder.BinaryDecoder, [string])
+
+
+@pytest.mark.parametrize('chunks', split_everywhere(HEX_UTF8))
+def test_hexadecimal_split_anywhere(chunks):
+    assert decode_chunks(decoder.HexadecimalDecoder, chunks) == 'H\u00e9\u20ac'
+
+
+def test_hexadecimal_odd_length():
+    with pytest.raises(binascii.Error):
+        decode_chunks(decoder.HexadecimalDecoder, ['414', '24'])
+
+
+def test_hexadecimal_invalid():
+    with pytest.raises(binascii.Error):
+        decode_chunks(decoder.HexadecimalDecoder, ['41zz'])
+
+
+MORSE_LINES = '.... ..\r\n\n.-- --- .-. .-.. -..\r\n'
+
+
+@pytest.mark.parametrize('chunks', split_everywhere(MORSE_LINES))
+def test_morse_split_anywhere(chunks):
+    assert decode_chunks(decoder.MorseDecoder, chunks) == 'HI\n\nWORLD\n'
+
+
+@pytest.mark.parametrize('chunks, expected', [
+    (['-----\n'], '0\n'),
+    (['....\r\n'], 'H\n'),
+    (['.... ..\n', '.-- --- .-. .-.. -..'], 'HI\nWORLD'),
+])
+def test_morse_line_breaks(chunks, expected):
+    assert decode_chunks(decoder.MorseDecoder, chunks) == expected
+
+
+@pytest.mark.parametrize('string', ['', '.-  .-', '.- ', '.-.-.-.-.-'])
+def test_morse_invalid(string):
+    with pytest.raises(ValueError):
+        decode_chunks(decoder.MorseDecoder, [string])
+
+
+def test_decode_file_removes_output_on_error(tmp_path):
+    input_path = tmp_path / 'in.txt'
+    output_path = tmp_path / 'out.txt'
+    input_path.write_text('0102')
+    with pytest.raises(ValueError):
+        decoder.decode_file(str(input_path), str(output_path), decoder.Mode.BINARY)
+    assert not output_path.exists()
+
+    input_path.write_text('01000001')
+    assert decoder.decode_file(str(input_path), str(output_path), decoder.Mode.BINARY) == 1
+    assert output_path.read_text() == 'A'
+
+
+@pytest.mark.parametrize('line, error', [
+    ('{"id": 2}', 'KeyError'),
+    ('{"id": 3, "message": 42}', 'TypeError'),
+    ('[1, 2]', 'TypeError'),
+    ('not json', 'JSONDecodeError'),
+])
+def test_batch_record_errors(line, error):
+    record = json.loads(decoder.decrypt_record(line))
+    assert record['mode'] is None
+    assert record['error'].startswith(error)
+
+
+def test_batch_keeps_going(tmp_path):
+    input_path = tmp_path / 'in.jsonl'
+    output_path = tmp_path / 'out.jsonl'
+    input_path.write_text('{"id": 1, "message": "48656c6c6f"}\n{"id": 2}\n{"id": 3, "message": ".... .."}\n')
+    assert decoder.decrypt_batch(str(input_path), str(output_path), 2) == 3
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [record['input']['id'] for record in records] == [1, 2, 3]
+    assert [record['mode'] for record in records] == ['hexadecimal', None, 'morse']
+
+
+def test_batch_keeps_input_fields():
+    record = json.loads(decoder.decrypt_record('{"message": "48656c6c6f", "mode": "field", "score": 1}'))
+    assert record['input'] == {'message': '48656c6c6f', 'mode': 'field', 'score': 1}
+    assert (record['mode'], record['decoded'], record['error']) == ('hexadecimal', 'Hello', None)
+
+
+MESSAGES = [
+    'The password is swordfish',
+    'Meet me at the old barn tonight',
+    'Andy hid the key under the apple tree',
+    'Look behind the tractor in the shed',
+    'The treasure is buried near the well',
+    'Do not trust the man in the red hat',
+    'Check the basement for another clue',
+    'Keep this note safe and tell nobody',
+    'Follow the river until you see the mill',
+    'Your reward is waiting in the attic',
+]
+
+
+@pytest.mark.parametrize('message', MESSAGES)
+def test_batch_identifies_atbash(message):
+    assert decoder.decrypt_best(decoder.decrypt_atbash(message))[:2] == (decoder.Mode.ATBASH, message)
+
+
+@pytest.mark.parametrize('message', MESSAGES)
+def test_batch_identifies_caesar(message):
+    assert decoder.decrypt_best(decoder.shift_letters(message, 11))[:2] == (decoder.Mode.CAESAR, message)
+
+
+def test_batch_prefers_non_ascii_text():
+    message = 'Привет мир'.encode().hex()
+    mode, decoded, _ = decoder.decrypt_best(message)
+    assert (mode, decoded) == (decoder.Mode.HEXADECIMAL, 'Привет мир')
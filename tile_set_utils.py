@@ -25,6 +25,7 @@
 #
 # Options:
 # -w: Overwrite existing files. Does not overwrite directories (e.g. for the 'extract' mode).
+# --profile, --profile-output, --profile-dump: see profiling.py.
 #
 # Mode descriptions
 # layout: change padding and/or margin.
@@ -69,6 +70,8 @@ import time
 
 from PIL import Image
 
+import profiling
+
 MODES = {
     'layout': None,
     'pow2': None,
@@ -106,7 +109,9 @@ parser.add_argument(
     'params',
     nargs='*'
 )
+profiling.add_arguments(parser)
 args = parser.parse_args()
+profiler = profiling.start(args)
 
 input_path = args.input[0]
 overwrite = args.overwrite
@@ -278,6 +283,7 @@ if func is None:
     halt('Mode not yet implemented')
 else:
     start = time.time()  # perf_counter() is too precise for such tasks.
-    func()
+    with profiler.phase(mode, byte_count=os.path.getsize(input_path)):  # Precise timings go to --profile instead.
+        func()
     end = time.time()
     print(f'Done in {round(end - start, 3)}s.')